@@ -0,0 +1,456 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+import numpy as np
+import pandas as pd
+import pybaseball as pb
+from numba import njit, prange
+from datetime import datetime, timedelta
+
+# Aggregated tables are persisted here so a fresh session can skip the season fetch
+CACHE_DIR = 'cache'
+# Date ranges kept in the Streamlit cache for get_aggregates
+CACHE_MAX_ENTRIES = 16
+
+# Statcast columns needed for the release point analysis
+KEY_COLS = ['player_name', 'pitch_name']
+RELEASE_COLS = ['release_pos_x', 'release_pos_y', 'release_pos_z']
+
+# Number of Statcast chunk requests to run concurrently. This is the only source of
+# concurrency; each chunk is fetched serially so baseballsavant is not flooded.
+FETCH_WORKERS = 8
+
+# Define distinct colors for each pitch type
+COLOR_MAP = {
+    '4-Seam Fastball': 'red',
+    '2-Seam Fastball': 'red',
+    'Sinker': 'purple',
+    'Cutter': 'orange',
+    'Slider': 'yellow',
+    'Sweeper': 'yellow',
+    'Curveball': 'blue',
+    'Knuckle Curve': 'blue',
+    'Changeup': 'green',
+    'Splitter': 'pink',
+    'Knuckleball': 'black',
+}
+
+class IncompleteFetchError(Exception):
+    """
+    Raised by get_aggregates when no data or only part of the date range could be fetched.
+    Raising keeps st.cache_data from storing the incomplete result; load_plot_data keeps it for the session instead.
+    :param failed: List of (start, end, error) for the chunks that failed
+    :param plot_data: Plot data built from the chunks that did arrive, possibly empty
+    """
+    def __init__(self, failed, plot_data):
+        super().__init__(f"{len(failed)} chunk(s) failed to fetch")
+        self.failed = failed
+        self.plot_data = plot_data
+
+def fetch_chunk(start_dt, end_dt):
+    """
+    Fetch a single date range from Statcast, keeping only the analysis columns.
+    :param start_dt: Start date of the chunk (YYYY-MM-DD)
+    :param end_dt: End date of the chunk (YYYY-MM-DD)
+    :return: DataFrame restricted to the analysis columns
+    """
+    chunk = pb.statcast(start_dt=start_dt, end_dt=end_dt, parallel=False)
+    if chunk.empty:
+        return chunk
+    # Keep only the columns used for the analysis to limit memory use
+    chunk = chunk.loc[:, KEY_COLS + RELEASE_COLS].dropna()
+    # Release positions are only accurate to ~2 decimals, so float32 is plenty.
+    # Names are stored as Arrow strings rather than Python objects until they are categorized.
+    return chunk.astype({**{col: 'string[pyarrow]' for col in KEY_COLS},
+                         **{col: np.float32 for col in RELEASE_COLS}})
+
+def fetch_season_data(start_date, end_date, chunk_size_days=7):
+    """
+    Fetch season data in chunks, requesting the chunks concurrently.
+    :param start_date: Start date of the season (YYYY-MM-DD)
+    :param end_date: End date of the season (YYYY-MM-DD)
+    :param chunk_size_days: Number of days per chunk
+    :return: Tuple of (combined DataFrame restricted to the analysis columns, list of (start, end, error) for failed chunks)
+    """
+    all_data = []  # List to hold chunked data
+    failed = []  # Chunks that could not be fetched
+    current_start = datetime.strptime(start_date, "%Y-%m-%d")
+    end_date = datetime.strptime(end_date, "%Y-%m-%d")
+    chunk_size = timedelta(days=chunk_size_days)
+
+    # Build the list of (start, end) date ranges up front
+    ranges = []
+    while current_start <= end_date:
+        current_end = min(current_start + chunk_size - timedelta(days=1), end_date)
+        ranges.append((current_start.strftime("%Y-%m-%d"), current_end.strftime("%Y-%m-%d")))
+        current_start += chunk_size
+
+    # Requests are I/O bound, so fetch them on a thread pool
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        futures = [executor.submit(fetch_chunk, start, end) for start, end in ranges]
+
+        # Streamlit calls must stay on the main thread, so report progress while gathering
+        for (start, end), future in zip(ranges, futures):
+            try:
+                chunk = future.result()
+                st.write(f"Fetched data from {start} to {end}.")
+                if not chunk.empty:
+                    all_data.append(chunk)
+            except Exception as e:
+                failed.append((start, end, str(e)))
+
+    # Combine all chunks into a single DataFrame
+    data = pd.concat(all_data, ignore_index=True) if all_data else pd.DataFrame()
+    return data, failed
+
+def run_starts(sorted_values):
+    """
+    Find where each run of equal values starts, without sorting again.
+    :param sorted_values: Array in which equal values are contiguous
+    :return: Start index of each run
+    """
+    return np.flatnonzero(np.concatenate(([True], sorted_values[1:] != sorted_values[:-1])))
+
+@njit(parallel=True, cache=True)
+def group_mean_std(offsets, x, y, z):
+    """
+    Compute the mean and sample std dev of each group for all three axes in one pass.
+    :param offsets: Start index of each group in x, y and z
+    :param x: Release X values sorted so that each group is contiguous
+    :param y: Release Y values in the same order as x
+    :param z: Release Z values in the same order as x
+    :return: Tuple of (count, mean, std); count has one entry per group, mean and std have shape (groups, 3)
+    """
+    n_groups = len(offsets)
+    counts = np.empty(n_groups, dtype=np.int64)
+    mean = np.empty((n_groups, 3))
+    std = np.zeros((n_groups, 3))
+
+    for g in prange(n_groups):
+        start = offsets[g]
+        end = offsets[g + 1] if g + 1 < n_groups else len(x)
+        count = end - start
+        counts[g] = count
+
+        sx = sy = sz = 0.0
+        sqx = sqy = sqz = 0.0
+        for i in range(start, end):
+            # Widen to float64 before squaring to keep the variance accurate
+            xi = np.float64(x[i])
+            yi = np.float64(y[i])
+            zi = np.float64(z[i])
+            sx += xi
+            sy += yi
+            sz += zi
+            sqx += xi * xi
+            sqy += yi * yi
+            sqz += zi * zi
+
+        mean[g, 0] = sx / count
+        mean[g, 1] = sy / count
+        mean[g, 2] = sz / count
+
+        # Single-pitch groups have no std dev; leave 0 to avoid issues in plotting
+        if count > 1:
+            std[g, 0] = np.sqrt(max(sqx / count - mean[g, 0] ** 2, 0.0) * count / (count - 1))
+            std[g, 1] = np.sqrt(max(sqy / count - mean[g, 1] ** 2, 0.0) * count / (count - 1))
+            std[g, 2] = np.sqrt(max(sqz / count - mean[g, 2] ** 2, 0.0) * count / (count - 1))
+
+    return counts, mean, std
+
+def combine_group_stats(counts, mean, std, offsets):
+    """
+    Combine per-group statistics into statistics for contiguous runs of groups.
+    :param counts: Number of values in each group
+    :param mean: Per-group means of shape (groups, 3)
+    :param std: Per-group sample std devs of shape (groups, 3)
+    :param offsets: Start index of each run of groups
+    :return: Tuple of (mean, std) arrays with one row per run
+    """
+    counts = counts[:, None]
+    totals = np.add.reduceat(counts, offsets)
+    total_mean = np.add.reduceat(counts * mean, offsets) / totals
+
+    # Sum of squares is the within-group spread plus each group's offset from the run mean
+    run_sizes = np.diff(np.append(offsets, len(counts)))
+    sq_dev = (counts - 1) * std ** 2 + counts * (mean - np.repeat(total_mean, run_sizes, axis=0)) ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        total_var = np.add.reduceat(sq_dev, offsets) / (totals - 1)
+
+    # Single-pitch pitchers have no std dev; use 0 to avoid issues in plotting
+    return total_mean, np.where(totals > 1, np.sqrt(total_var), 0.0)
+
+def aggregate_release_points(data):
+    """
+    Aggregate release point statistics per pitch type and per pitcher.
+    :param data: DataFrame returned by fetch_season_data
+    :return: Tuple of (pitch_grouped, player_grouped) DataFrames
+    """
+    # Group on integer category codes instead of hashing the name strings
+    player_names = data['player_name'].astype('category')
+    pitch_names = data['pitch_name'].astype('category')
+    player_codes = player_names.cat.codes.to_numpy().astype(np.int64)
+    pitch_codes = pitch_names.cat.codes.to_numpy().astype(np.int64)
+
+    # Sort once by (player_name, pitch_name); both groupings are then contiguous runs.
+    # Only observed combinations produce a group.
+    key = player_codes * len(pitch_names.cat.categories) + pitch_codes
+    order = np.argsort(key)
+    player_codes, pitch_codes = player_codes[order], pitch_codes[order]
+    pitch_offsets = run_starts(key[order])
+
+    # Calculate mean and std dev for each pitch, and for each pitcher across all pitches
+    # Inputs stay float32; the kernel accumulates in float64
+    x, y, z = (data[col].to_numpy()[order] for col in RELEASE_COLS)
+    pitch_counts, pitch_mean, pitch_std = group_mean_std(pitch_offsets, x, y, z)
+
+    # Pitcher-level stats are combined from the (much smaller) pitch-level table
+    # rather than by another pass over every pitch
+    pitch_players = player_codes[pitch_offsets]
+    player_offsets = run_starts(pitch_players)
+    player_mean, player_std = combine_group_stats(pitch_counts, pitch_mean, pitch_std, player_offsets)
+
+    # Build each table in one go with flat, named columns, indexed by pitcher
+    # (already sorted above) for fast per-pitcher lookups
+    pitch_grouped = pd.DataFrame(
+        {
+            # Keep pitch names categorical so colors can be looked up by code
+            'pitch_name': pd.Categorical.from_codes(pitch_codes[pitch_offsets], pitch_names.cat.categories),
+            **{f'{col}_mean': pitch_mean[:, i] for i, col in enumerate(RELEASE_COLS)},
+            **{f'{col}_std': pitch_std[:, i] for i, col in enumerate(RELEASE_COLS)},
+        },
+        index=pd.Index(player_names.cat.categories[pitch_players], name='player_name'),
+    )
+    player_grouped = pd.DataFrame(
+        {
+            **{f'{col}_mean_all': player_mean[:, i] for i, col in enumerate(RELEASE_COLS)},
+            **{f'{col}_std_all': player_std[:, i] for i, col in enumerate(RELEASE_COLS)},
+        },
+        index=pd.Index(player_names.cat.categories[pitch_players[player_offsets]], name='player_name'),
+    )
+
+    return pitch_grouped, player_grouped
+
+def cache_paths(start_date, end_date):
+    """
+    Build the Parquet cache file paths for a date range.
+    :param start_date: Start date of the range (YYYY-MM-DD)
+    :param end_date: End date of the range (YYYY-MM-DD)
+    :return: Tuple of (pitch_grouped path, player_grouped path)
+    """
+    suffix = f"{start_date}_{end_date}.parquet"
+    return (os.path.join(CACHE_DIR, f"pitch_grouped_{suffix}"),
+            os.path.join(CACHE_DIR, f"player_grouped_{suffix}"))
+
+def is_cache_fresh(path, as_of):
+    """
+    Check whether a cache file exists and was written on the as_of day.
+    This matches the daily as_of key of get_aggregates, so both caches expire together.
+    :param path: Path to the cache file
+    :param as_of: Date the tables are requested on (YYYY-MM-DD)
+    :return: True if the file can be reused
+    """
+    return (os.path.exists(path) and
+            datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d") == as_of)
+
+def build_plot_data(pitch_grouped, player_grouped):
+    """
+    Precompute the Plotly trace data for every pitcher so selecting one is a dict lookup.
+    :param pitch_grouped: Per-pitch-type stats indexed by player_name
+    :param player_grouped: Per-pitcher stats indexed by player_name
+    :return: Dict mapping pitcher name to the data for plot_release_points
+    """
+    # Color for each pitch_name category, indexed by categorical code
+    pitch_colors = np.array([COLOR_MAP.get(c, 'gray') for c in pitch_grouped['pitch_name'].cat.categories])
+    colors = pitch_colors[pitch_grouped['pitch_name'].cat.codes.to_numpy()]
+
+    xs = pitch_grouped['release_pos_x_mean'].to_numpy()
+    ys = pitch_grouped['release_pos_y_mean'].to_numpy()
+    zs = pitch_grouped['release_pos_z_mean'].to_numpy()
+
+    # Error bars for standard deviation across all axes, one row per pitch type.
+    # Each pitch contributes one segment per axis; Plotly breaks lines at None.
+    x_std = pitch_grouped['release_pos_x_std'].to_numpy()
+    y_std = pitch_grouped['release_pos_y_std'].to_numpy()
+    z_std = pitch_grouped['release_pos_z_std'].to_numpy()
+    gap = np.full(len(xs), None)
+
+    x_lines = np.column_stack([xs - x_std, xs + x_std, gap, xs, xs, gap, xs, xs, gap])
+    y_lines = np.column_stack([ys, ys, gap, ys - y_std, ys + y_std, gap, ys, ys, gap])
+    z_lines = np.column_stack([zs, zs, gap, zs, zs, gap, zs - z_std, zs + z_std, gap])
+
+    # Rows for each pitcher are contiguous and in the same order as player_grouped
+    starts = run_starts(pitch_grouped.index.to_numpy())
+    ends = np.append(starts[1:], len(pitch_grouped))
+
+    overall = player_grouped[[f'{col}_mean_all' for col in RELEASE_COLS]].to_numpy().tolist()
+
+    plot_data = {}
+    for name, (mean_x, mean_y, mean_z), start, end in zip(player_grouped.index, overall, starts, ends):
+        pitcher_colors = colors[start:end]
+        plot_data[name] = {
+            'x': xs[start:end].tolist(),
+            'y': ys[start:end].tolist(),
+            'z': zs[start:end].tolist(),
+            'colors': pitcher_colors.tolist(),
+            'pitch_names': pitch_grouped['pitch_name'].iloc[start:end].tolist(),
+            'x_lines': x_lines[start:end].ravel().tolist(),
+            'y_lines': y_lines[start:end].ravel().tolist(),
+            'z_lines': z_lines[start:end].ravel().tolist(),
+            'line_colors': np.repeat(pitcher_colors, 9).tolist(),
+            'overall_x': [mean_x],
+            'overall_y': [mean_y],
+            'overall_z': [mean_z],
+            # Determine if the pitcher is left or right-handed based on release_pos_x_mean
+            'handedness': 'Left-Handed' if mean_x > 0 else 'Right-Handed',
+        }
+
+    return plot_data
+
+# Persisted across restarts; Streamlit ignores ttl for disk-persisted caches, so
+# as_of is part of the cache key instead to expire entries daily, and
+# clear_stale_aggregates drops earlier days' entries. Incomplete fetches raise,
+# so they are never cached.
+@st.cache_data(persist='disk', show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def get_aggregates(start_date, end_date, as_of):
+    """
+    Load the per-pitcher plot data for a date range.
+    Tables written today are read from the Parquet cache, otherwise the season is fetched and aggregated.
+    :param start_date: Start date of the range (YYYY-MM-DD)
+    :param end_date: End date of the range (YYYY-MM-DD)
+    :param as_of: Date the tables are requested on (YYYY-MM-DD)
+    :return: Dict mapping pitcher name to plot data (see build_plot_data), in name order
+    :raises IncompleteFetchError: If no data or only part of the range could be fetched
+    """
+    pitch_cache_path, player_cache_path = cache_paths(start_date, end_date)
+
+    if is_cache_fresh(pitch_cache_path, as_of) and is_cache_fresh(player_cache_path, as_of):
+        pitch_grouped = pd.read_parquet(pitch_cache_path, engine='pyarrow')
+        player_grouped = pd.read_parquet(player_cache_path, engine='pyarrow')
+        return build_plot_data(pitch_grouped, player_grouped)
+
+    data, failed = fetch_season_data(start_date, end_date, chunk_size_days=3)
+    if data.empty:
+        raise IncompleteFetchError(failed, {})
+
+    pitch_grouped, player_grouped = aggregate_release_points(data)
+    if failed:
+        raise IncompleteFetchError(failed, build_plot_data(pitch_grouped, player_grouped))
+
+    # Only persist tables built from the full date range
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    pitch_grouped.to_parquet(pitch_cache_path, engine='pyarrow')
+    player_grouped.to_parquet(player_cache_path, engine='pyarrow')
+
+    return build_plot_data(pitch_grouped, player_grouped)
+
+def plot_release_points(pitcher_name, plot_data):
+    # Plotly is slow to import, so only load it once a plot is actually drawn
+    import plotly.graph_objects as go
+
+    # Create Plotly 3D scatter plot from the precomputed data for this pitcher
+    fig = go.Figure()
+    pitcher_data = plot_data[pitcher_name]
+
+    # Plot average release point for each pitch type, one trace each so the legend keys the colors
+    for x, y, z, color, pitch_name in zip(pitcher_data['x'], pitcher_data['y'], pitcher_data['z'],
+                                          pitcher_data['colors'], pitcher_data['pitch_names']):
+        fig.add_trace(go.Scatter3d(
+            x=[x],
+            y=[y],
+            z=[z],
+            mode='markers',
+            marker=dict(size=5, color=color),
+            name=pitch_name
+        ))
+
+    # Add error bars for standard deviation across all axes as a single trace
+    fig.add_trace(go.Scatter3d(
+        x=pitcher_data['x_lines'],
+        y=pitcher_data['y_lines'],
+        z=pitcher_data['z_lines'],
+        mode='lines',
+        line=dict(color=pitcher_data['line_colors'], width=2),
+        hoverinfo='skip',
+        showlegend=False
+    ))
+
+    # Plot overall average release point for the pitcher
+    fig.add_trace(go.Scatter3d(
+        x=pitcher_data['overall_x'],
+        y=pitcher_data['overall_y'],
+        z=pitcher_data['overall_z'],
+        mode='markers',
+        marker=dict(size=10, color='green'),
+        name='Overall Mean'
+    ))
+
+    # Set plot title and axis labels
+    fig.update_layout(
+        title=f"Release Points for {pitcher_name} ({pitcher_data['handedness']})",
+        scene=dict(
+            xaxis_title="Release Pos X",
+            yaxis_title="Release Pos Y",
+            zaxis_title="Release Pos Z"
+        )
+    )
+
+    st.plotly_chart(fig)
+
+def clear_stale_aggregates(as_of):
+    """
+    Clear the get_aggregates cache, including its disk files, once the day changes.
+    Streamlit's disk cache never evicts on its own, so this keeps it to today's entries.
+    :param as_of: Date the tables are requested on (YYYY-MM-DD)
+    """
+    day_path = os.path.join(CACHE_DIR, 'aggregates_day.txt')
+    if os.path.exists(day_path):
+        with open(day_path) as f:
+            if f.read() == as_of:
+                return
+
+    get_aggregates.clear()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(day_path, 'w') as f:
+        f.write(as_of)
+
+def partial_fetch_key(start_date, end_date, as_of):
+    """
+    Build the st.session_state key for an incomplete fetch of a date range.
+    :param start_date: Start date of the range (YYYY-MM-DD)
+    :param end_date: End date of the range (YYYY-MM-DD)
+    :param as_of: Date the tables are requested on (YYYY-MM-DD)
+    :return: Session state key
+    """
+    return f"partial_fetch_{start_date}_{end_date}_{as_of}"
+
+def load_plot_data(start_date, end_date, as_of):
+    """
+    Load the per-pitcher plot data for a date range within the current Streamlit session.
+    Incomplete fetches are kept in st.session_state so reruns (e.g. selecting a pitcher) reuse
+    them instead of fetching the whole range again; they are never written to the disk caches.
+    :param start_date: Start date of the range (YYYY-MM-DD)
+    :param end_date: End date of the range (YYYY-MM-DD)
+    :param as_of: Date the tables are requested on (YYYY-MM-DD)
+    :return: Tuple of (plot_data, list of (start, end, error) for failed chunks)
+    """
+    clear_stale_aggregates(as_of)
+
+    key = partial_fetch_key(start_date, end_date, as_of)
+    if key in st.session_state:
+        return st.session_state[key]
+
+    try:
+        return get_aggregates(start_date, end_date, as_of), []
+    except IncompleteFetchError as e:
+        st.session_state[key] = (e.plot_data, e.failed)
+        return e.plot_data, e.failed
+
+def discard_partial_fetch(start_date, end_date, as_of):
+    """
+    Forget a session's incomplete fetch so the next run fetches the range again.
+    :param start_date: Start date of the range (YYYY-MM-DD)
+    :param end_date: End date of the range (YYYY-MM-DD)
+    :param as_of: Date the tables are requested on (YYYY-MM-DD)
+    """
+    st.session_state.pop(partial_fetch_key(start_date, end_date, as_of), None)